@@ -1,22 +1,21 @@
 from fastapi.concurrency import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 
 from llmockapi.config import Config, config
 from llmockapi.middleware import MockResponseMiddleWare
 from llmockapi.internal_route import router as internal_router
 
 
+mock_response_middleware = MockResponseMiddleWare(config=config)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    yield {
-        "messages": [
-            {
-                "role": "system",
-                "content": await config.get_system_prompt(),
-            }
-        ]
-    }
+    config.get_chat_template_parts()
+    yield {"messages": [await config.get_system_message()]}
+    await mock_response_middleware.close()
 
 
 app = FastAPI(
@@ -24,7 +23,8 @@ app = FastAPI(
     lifespan=lifespan,
 )
 app.include_router(internal_router)
-app.middleware("http")(MockResponseMiddleWare(config=config))
+app.middleware("http")(mock_response_middleware)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 
 def main(config: Config = config) -> None:
@@ -32,5 +32,6 @@ def main(config: Config = config) -> None:
         "llmockapi:app",
         host=config.host,
         port=config.port,
-        reload=True,
+        http="httptools",
+        reload=config.reload,
     )
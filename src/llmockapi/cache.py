@@ -0,0 +1,43 @@
+import time
+from collections import OrderedDict
+
+from fastapi import Response
+
+
+class ResponseCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[float, int, bytes, dict]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Response | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, status_code, body, headers = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return Response(content=body, status_code=status_code, headers=headers)
+
+    def set(self, key: bytes, response: Response) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (
+            time.monotonic() + self.ttl,
+            response.status_code,
+            response.body,
+            dict(response.headers),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,8 +1,7 @@
 import os
 import logging
-import json
 import aiohttp
-import asyncio
+import orjson
 from fastapi.datastructures import Headers
 from fastapi import Request, Response
 
@@ -13,67 +12,93 @@ logging.basicConfig(
 )
 logger = logging.getLogger("LLMClient")
 
+FILTERED_HEADERS = frozenset((b"authorization", b"basic"))
+
 
 class LLMClient:
     def __init__(self, config: Config):
         self.config = config
-        self.lock = asyncio.Lock()
+        self._model = config.model
+        self._base_url = config.base_url.rstrip("/") + "/"
+        self._headers = {
+            "Authorization": f"Bearer {config.api_key}",
+            "content-type": "application/json",
+        }
+        self._session: aiohttp.ClientSession | None = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                base_url=self._base_url,
+                headers=self._headers,
+                connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=60),
+            )
+        return self._session
 
-    def get_header_lines(self, headers: Headers):
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_header_lines(self, headers: Headers) -> list[bytes]:
+        # Header names in the raw list are already lowercased by the server.
         return [
-            f"{key}: {value}"
-            for key, value in headers.items()
-            if key.lower() not in ["authorization", "basic"]
+            b"%s: %s" % (key, value)
+            for key, value in headers.raw
+            if key not in FILTERED_HEADERS
         ]
 
-    def sanitize_response(self, json_response: dict):
+    def get_user_content(self, request: Request, body: bytes) -> str:
+        content = bytearray(
+            f"{request.method} {request.scope["path"]} HTTP/1.1\r\n".encode()
+        )
+        for line in self.get_header_lines(request.headers):
+            content += line
+            content += b"\r\n"
+        content += body
+        # Clients may send bodies that are not valid UTF-8.
+        return content.decode("utf-8", "replace")
+
+    def get_message(self, json_response: dict) -> str:
         logger.debug(json_response)
-        message: str = json_response["choices"][0]["message"]["content"]
+        message: str = json_response["choices"][0]["message"]["content"].strip()
         if message.startswith("```"):
-            message = message.replace("```json\n", "")
-            message = message.replace("\n```", "")
+            message = message.removeprefix("```json").removeprefix("```")
+            message = message.removesuffix("```").strip()
         logger.debug(message)
-        return json.loads(message)
+        return message
+
+    def sanitize_response(self, json_response: dict):
+        return orjson.loads(self.get_message(json_response))
 
     async def get_response(self, request: Request):
-        async with self.lock:
-            body = await request.body()
-            request.state.messages.append(
-                {
-                    "role": "user",
-                    "content": "\r\n".join(
-                        [
-                            f"{request.method} {request.url.path} HTTP/1.1",
-                            *self.get_header_lines(request.headers),
-                            body.decode(),
-                        ]
-                    ),
-                }
-            )
-            payload = {
-                "model": self.config.model,
-                "messages": request.state.messages,
-            }
+        body = await request.body()
+        user_message = {
+            "role": "user",
+            "content": self.get_user_content(request, body),
+        }
+        payload = {
+            "model": self._model,
+            "messages": [*request.state.messages, user_message],
+        }
 
-            logger.debug(payload)
+        logger.debug(payload)
 
-            async with aiohttp.ClientSession(
-                base_url=self.config.base_url.strip("/") + "/",
-                headers={
-                    "Authorization": f"Bearer {self.config.api_key}",
-                    "content-type": "application/json",
-                },
-            ) as session:
-                async with session.post(
-                    "v1/chat/completions",
-                    data=json.dumps(payload),
-                ) as res:
-                    response = self.sanitize_response(await res.json())
-                    request.state.messages.append(
-                        {"role": "assistant", "content": json.dumps(response)}
-                    )
-                    return Response(
-                        status_code=response["status_code"],
-                        content=json.dumps(response["content"], default=str),
-                        headers=response["headers"],
-                    )
+        session = await self._get_session()
+        async with session.post(
+            "v1/chat/completions",
+            data=orjson.dumps(payload),
+        ) as res:
+            message = self.get_message(orjson.loads(await res.read()))
+            response = orjson.loads(message)
+            # Record the exchange only once it completes so concurrent requests
+            # never interleave a user turn with another request's reply.
+            request.state.messages.extend(
+                [user_message, {"role": "assistant", "content": message}]
+            )
+            return Response(
+                status_code=response["status_code"],
+                content=orjson.dumps(response["content"], default=str),
+                headers=response["headers"],
+                media_type="application/json",
+            )
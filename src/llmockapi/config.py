@@ -1,8 +1,14 @@
 from pathlib import Path
-import json
+import asyncio
+import functools
+import hashlib
+import orjson
 import yaml
 import os
 import sys
+import tempfile
+from typing import Any
+from urllib.parse import urlparse
 import aiohttp
 from pydantic_settings import (
     BaseSettings,
@@ -22,6 +28,32 @@ Always return with following json structure {"content": any, "status_code": int,
 <b>Never respond anything outside of the specification.</b>
 """
 
+SYSTEM_PROMPT_PREFIX = "\n".join([SYSTEM_PROMPT, "", "<spec>"])
+SYSTEM_PROMPT_SUFFIX = "</spec>"
+
+CHAT_TEMPLATE_PATH = Path(__file__).parent / "chat_template.html"
+CHAT_DATA_PLACEHOLDER = b"const chatData = [];"
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@functools.lru_cache(maxsize=None)
+def _read_chat_template(path: Path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
 
 class Config(BaseSettings):
     model_config = SettingsConfigDict(
@@ -44,9 +76,30 @@ class Config(BaseSettings):
     model: str = Field(default="anthropic/claude-haiku-4.5")
     host: str = Field(default="localhost")
     port: int = Field(default=9000)
+    reload: bool = Field(default=False)
+    spec_cache_dir: str = Field(
+        default="",
+        validation_alias=AliasChoices("spec_cache_dir", "spec-cache-dir"),
+    )
+    cache_size: int = Field(
+        default=1024,
+        validation_alias=AliasChoices("cache_size", "cache-size"),
+    )
+    cache_ttl: int = Field(
+        default=3600,
+        validation_alias=AliasChoices("cache_ttl", "cache-ttl"),
+    )
+    chat_template_path: Path = Field(
+        default=CHAT_TEMPLATE_PATH,
+        validation_alias=AliasChoices("chat_template_path", "chat-template-path"),
+    )
 
-    _api_spec: str = ""
-    _chat_template: str = ""
+    _api_spec: Any = None
+    _api_spec_loaded: bool = False
+    _api_spec_error: FileNotFoundError | IsADirectoryError | None = None
+    _system_prompt: str = ""
+    _system_message: dict | None = None
+    _chat_template_parts: tuple[bytes, bytes] | None = None
 
     @classmethod
     def settings_customise_sources(
@@ -62,46 +115,100 @@ class Config(BaseSettings):
             return env_settings, init_settings
         return CliSettingsSource(settings_cls, cli_parse_args=True), env_settings
 
-    async def get_http_spec(self):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.mock_api_spec) as response:
-                return await response.text()
-
-    def get_local_spec(self):
-        with open(self.mock_api_spec) as f:
-            if self.mock_api_spec.endswith(".json"):
-                return json.load(f)
-            elif self.mock_api_spec.endswith(".yaml"):
-                return yaml.safe_load(f)
-            else:
-                return f.read()
-
-    async def get_api_spec(self):
-        if self._api_spec:
+    def get_spec_cache_path(self) -> Path | None:
+        if not self.spec_cache_dir:
+            return None
+        name = hashlib.blake2b(self.mock_api_spec.encode(), digest_size=16)
+        return Path(self.spec_cache_dir).expanduser() / f"{name.hexdigest()}.txt"
+
+    def parse_spec(self, raw: bytes, path: str) -> Any:
+        if path.endswith(".json"):
+            return orjson.loads(raw)
+        elif path.endswith((".yaml", ".yml")):
+            return yaml.load(raw, Loader=YAML_LOADER)
+        else:
+            return raw.decode()
+
+    async def get_http_spec(self) -> Any:
+        cache_path = self.get_spec_cache_path()
+        if cache_path is not None and cache_path.exists():
+            raw = await asyncio.to_thread(cache_path.read_bytes)
+        else:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(
+                    self.mock_api_spec, raise_for_status=True
+                ) as response:
+                    raw = await response.read()
+
+            if cache_path is not None:
+                await asyncio.to_thread(_write_atomic, cache_path, raw)
+
+        return await asyncio.to_thread(
+            self.parse_spec, raw, urlparse(self.mock_api_spec).path
+        )
+
+    def _read_local_spec(self) -> Any:
+        with open(self.mock_api_spec, "rb") as f:
+            return self.parse_spec(f.read(), self.mock_api_spec)
+
+    async def get_local_spec(self) -> Any:
+        return await asyncio.to_thread(self._read_local_spec)
+
+    async def get_api_spec(self) -> Any:
+        if self._api_spec_loaded:
             return self._api_spec
 
         if self.mock_api_spec.startswith("http"):
             self._api_spec = await self.get_http_spec()
-            return self._api_spec
-
-        self._api_spec = self.get_local_spec()
+        else:
+            if self._api_spec_error is not None:
+                raise self._api_spec_error.with_traceback(None)
+            try:
+                self._api_spec = await self.get_local_spec()
+            except (FileNotFoundError, IsADirectoryError) as e:
+                self._api_spec_error = e
+                raise
+        self._api_spec_loaded = True
         return self._api_spec
 
     async def get_system_prompt(self):
+        if self._system_prompt:
+            return self._system_prompt
+
         api_spec = await self.get_api_spec()
-        return "\n".join(
-            [
-                SYSTEM_PROMPT,
-                "",
-                f"<spec>{api_spec}</spec>",
-            ]
+        if not isinstance(api_spec, str):
+            api_spec = orjson.dumps(
+                api_spec, default=str, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+        self._system_prompt = "".join(
+            [SYSTEM_PROMPT_PREFIX, api_spec, SYSTEM_PROMPT_SUFFIX]
         )
-
-    def get_chat_template(self):
-        if self._chat_template == "":
-            with open(Path(__file__).parent / "chat_template.html") as f:
-                self._chat_template = f.read()
-        return self._chat_template
+        return self._system_prompt
+
+    async def get_system_message(self) -> dict:
+        # Shared by every conversation; it is only ever read, never mutated.
+        if self._system_message is None:
+            self._system_message = {
+                "role": "system",
+                "content": await self.get_system_prompt(),
+            }
+        return self._system_message
+
+    def get_chat_template(self) -> bytes:
+        return _read_chat_template(self.chat_template_path)
+
+    def get_chat_template_parts(self) -> tuple[bytes, bytes]:
+        if self._chat_template_parts is None:
+            prefix, placeholder, suffix = self.get_chat_template().partition(
+                CHAT_DATA_PLACEHOLDER
+            )
+            if not placeholder:
+                raise ValueError(
+                    f"Chat template {self.chat_template_path} is missing the "
+                    f"{CHAT_DATA_PLACEHOLDER.decode()!r} placeholder"
+                )
+            self._chat_template_parts = (prefix, suffix)
+        return self._chat_template_parts
 
 
 config = Config()
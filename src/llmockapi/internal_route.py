@@ -1,11 +1,42 @@
-import asyncio
 from llmockapi.config import config
-from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi import APIRouter, Request
-import json
+from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request, Response
+import orjson
+
+
+class MessagesEncoder:
+    def __init__(self):
+        self._messages: list | None = None
+        self._count = 0
+        self._last = None
+        self._encoded = bytearray()
+
+    def encode(self, messages: list) -> bytes:
+        # The list may have been truncated and regrown in place since the last
+        # call, so also check that the last encoded message is still there.
+        if (
+            messages is not self._messages
+            or len(messages) < self._count
+            or (self._count and messages[self._count - 1] is not self._last)
+        ):
+            self._messages = messages
+            self._count = 0
+            self._last = None
+            self._encoded = bytearray()
+
+        for message in messages[self._count :]:
+            if self._encoded:
+                self._encoded += b","
+            self._encoded += orjson.dumps(message, default=str)
+        self._count = len(messages)
+        if messages:
+            self._last = messages[-1]
+
+        return b"".join([b"[", self._encoded, b"]"])
 
 
 router = APIRouter()
+messages_encoder = MessagesEncoder()
 
 
 @router.get("/health")
@@ -15,20 +46,17 @@ async def health():
 
 @router.get("/messages")
 async def messages(request: Request):
-    return JSONResponse(
-        content=request.state.messages,
+    return Response(
+        content=messages_encoder.encode(request.state.messages),
+        media_type="application/json",
     )
 
 
 @router.get("/ui")
 async def ui(request: Request):
-    async with asyncio.Lock():
-        template = config.get_chat_template()
-        messages = json.dumps(request.state.messages, default=str)
-
-        return HTMLResponse(
-            content=template.replace(
-                "const chatData = [];",
-                f"const chatData = {messages};",
-            )
-        )
+    prefix, suffix = config.get_chat_template_parts()
+    messages = messages_encoder.encode(request.state.messages)
+
+    return HTMLResponse(
+        content=b"".join([prefix, b"const chatData = ", messages, b";", suffix])
+    )
@@ -1,18 +1,73 @@
+import hashlib
 from typing import Callable
+from urllib.parse import urlencode
 
 from fastapi import Request
 
+from llmockapi.cache import ResponseCache
 from llmockapi.client import LLMClient
 from llmockapi.config import Config
 
+CACHEABLE_METHODS = ("GET", "HEAD")
+PASSTHROUGH_PREFIXES = ("/favicon.ico", "/robots.txt", "/__internal")
+CACHE_KEY_HEADERS = frozenset(
+    (b"accept", b"accept-language", b"content-type", b"cookie", b"api-key")
+)
+
 
 class MockResponseMiddleWare:
     def __init__(self, config: Config):
         self.llm_client = LLMClient(config=config)
+        self.cache = ResponseCache(maxsize=config.cache_size, ttl=config.cache_ttl)
+        self._generation = 0
+
+    async def close(self):
+        self.cache.clear()
+        await self.llm_client.close()
+
+    async def get_cache_key(self, request: Request) -> bytes:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        parts = [
+            request.method.encode(),
+            request.scope["path"].encode(),
+            query.encode(),
+        ]
+        # Headers are sent to the LLM too, so those that may change the mocked
+        # reply (content negotiation, cookies, API keys) are part of the key.
+        for name, value in sorted(request.headers.raw):
+            if name in CACHE_KEY_HEADERS or name.startswith(b"x-"):
+                parts += [name, value]
+        parts.append(await request.body())
+
+        # Length-prefix each part so no two requests can produce the same input.
+        key = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            key.update(b"%d:" % len(part))
+            key.update(part)
+        return key.digest()
 
     async def __call__(self, request: Request, call_next: Callable):
-        if request.url.path.startswith("/favicon.ico"):
+        if request.scope["path"].startswith(PASSTHROUGH_PREFIXES):
             return await call_next(request)
-        if request.url.path.startswith("/__internal"):
-            return await call_next(request)
-        return await self.llm_client.get_response(request)
+
+        # Anything other than a read may change the mocked server's state, so
+        # previously generated responses can no longer be trusted. Reads that
+        # overlap a write must not be cached either, since they may have been
+        # answered from the history as it was before the write completed.
+        if request.method not in CACHEABLE_METHODS:
+            self._generation += 1
+            self.cache.clear()
+            try:
+                return await self.llm_client.get_response(request)
+            finally:
+                self._generation += 1
+                self.cache.clear()
+
+        key = await self.get_cache_key(request)
+        response = self.cache.get(key)
+        if response is None:
+            generation = self._generation
+            response = await self.llm_client.get_response(request)
+            if generation == self._generation:
+                self.cache.set(key, response)
+        return response
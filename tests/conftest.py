@@ -5,6 +5,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import FastAPI, Request
+from fastapi.datastructures import Headers
 from llmockapi.config import Config
 
 
@@ -33,7 +34,7 @@ def mock_config():
     return config
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def api_spec_json():
     """Load the test API specification."""
     spec_path = Path(__file__).parent / "mocks" / "api_specs.json"
@@ -46,8 +47,8 @@ def mock_request():
     """Create a mock FastAPI request."""
     request = MagicMock(spec=Request)
     request.method = "GET"
-    request.url.path = "/pet/123"
-    request.headers = {"content-type": "application/json"}
+    request.scope = {"path": "/pet/123"}
+    request.headers = Headers({"content-type": "application/json"})
     request.body = AsyncMock(return_value=b'{"test": "data"}')
     request.state.messages = []
     return request
@@ -77,7 +78,7 @@ def mock_llm_response():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_app():
     """Create a test FastAPI application."""
     from llmockapi import app
@@ -85,22 +86,58 @@ def test_app():
     return app
 
 
-@pytest.fixture
-def test_client(test_app):
-    """Create a test client for the FastAPI application."""
+@pytest.fixture(scope="session")
+def session_client(test_app):
+    """Create a test client that runs the app lifespan once per worker."""
     with TestClient(test_app) as client:
         yield client
 
 
+@pytest.fixture
+def test_client(session_client, monkeypatch):
+    """Reset the shared client's conversation and response cache per test."""
+    from llmockapi import mock_response_middleware
+    from llmockapi.internal_route import MessagesEncoder
+
+    state = session_client.app_state
+    state["messages"] = [state["messages"][0]]
+    monkeypatch.setattr("llmockapi.internal_route.messages_encoder", MessagesEncoder())
+    session_client.portal.call(mock_response_middleware.close)
+    yield session_client
+
+
+def make_request(
+    path="/",
+    method="GET",
+    body=b"",
+    headers=None,
+    query_string=b"",
+    messages=None,
+):
+    """Build a real Starlette request from a minimal ASGI scope."""
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query_string,
+        "headers": Headers(headers or {}).raw,
+        "state": {"messages": [] if messages is None else messages},
+    }
+    return Request(scope, receive)
+
+
 def create_mock_aiohttp_session(response_data):
     """Helper to create a properly mocked aiohttp session."""
     mock_response = AsyncMock()
-    mock_response.json = AsyncMock(return_value=response_data)
-    mock_response.text = AsyncMock(
-        return_value=json.dumps(response_data)
-        if isinstance(response_data, dict)
-        else response_data
+    text = (
+        json.dumps(response_data) if isinstance(response_data, dict) else response_data
     )
+    mock_response.text = AsyncMock(return_value=text)
+    mock_response.read = AsyncMock(return_value=text.encode())
 
     mock_post_ctx = AsyncMock()
     mock_post_ctx.__aenter__ = AsyncMock(return_value=mock_response)
@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch
+from fastapi import Response
+from llmockapi.cache import ResponseCache
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Test suite for ResponseCache class."""
+
+    def test_get_missing_key(self):
+        """Test that unknown keys are a cache miss."""
+        cache = ResponseCache(maxsize=2, ttl=60)
+        assert cache.get(b"missing") is None
+
+    def test_set_and_get_rebuilds_response(self):
+        """Test that a cached response is rebuilt with status, body and headers."""
+        cache = ResponseCache(maxsize=2, ttl=60)
+        cache.set(
+            b"key",
+            Response(
+                content='{"id": 1}',
+                status_code=201,
+                headers={"x-mock": "yes"},
+            ),
+        )
+
+        response = cache.get(b"key")
+
+        assert response.status_code == 201
+        assert response.body == b'{"id": 1}'
+        assert response.headers["x-mock"] == "yes"
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = ResponseCache(maxsize=2, ttl=60)
+        cache.set(b"a", Response(content="a"))
+        cache.set(b"b", Response(content="b"))
+        cache.get(b"a")
+        cache.set(b"c", Response(content="c"))
+
+        assert len(cache) == 2
+        assert cache.get(b"a") is not None
+        assert cache.get(b"b") is None
+        assert cache.get(b"c") is not None
+
+    def test_expires_entries_after_ttl(self):
+        """Test that entries older than the ttl are a cache miss."""
+        cache = ResponseCache(maxsize=2, ttl=60)
+        with patch("llmockapi.cache.time.monotonic", return_value=100.0):
+            cache.set(b"key", Response(content="OK"))
+        with patch("llmockapi.cache.time.monotonic", return_value=159.0):
+            assert cache.get(b"key") is not None
+        with patch("llmockapi.cache.time.monotonic", return_value=161.0):
+            assert cache.get(b"key") is None
+        assert len(cache) == 0
+
+    def test_zero_maxsize_disables_cache(self):
+        """Test that a maxsize of zero never stores anything."""
+        cache = ResponseCache(maxsize=0, ttl=60)
+        cache.set(b"key", Response(content="OK"))
+        assert cache.get(b"key") is None
+
+    def test_clear(self):
+        """Test that clear drops every entry."""
+        cache = ResponseCache(maxsize=2, ttl=60)
+        cache.set(b"key", Response(content="OK"))
+        cache.clear()
+        assert len(cache) == 0
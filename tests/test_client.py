@@ -1,4 +1,6 @@
+import asyncio
 import json
+import orjson
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import Request, Response
@@ -16,7 +18,24 @@ class TestLLMClient:
         """Test LLMClient initialization."""
         client = LLMClient(config=mock_config)
         assert client.config == mock_config
-        assert client.lock is not None
+        assert client._base_url == "https://api.test.com/"
+        assert client._headers["Authorization"] == "Bearer test-api-key"
+
+    @pytest.mark.asyncio
+    async def test_session_uses_precomputed_settings(self, mock_config):
+        """Test that the pooled session is built from the precomputed settings."""
+        mock_config.base_url = "https://api.test.com/"
+        client = LLMClient(config=mock_config)
+
+        with patch("aiohttp.ClientSession") as mock_cls:
+            await client._get_session()
+
+        kwargs = mock_cls.call_args.kwargs
+        assert kwargs["base_url"] == "https://api.test.com/"
+        assert kwargs["headers"] == {
+            "Authorization": "Bearer test-api-key",
+            "content-type": "application/json",
+        }
 
     def test_get_header_lines_filters_auth_headers(self, mock_config):
         """Test that get_header_lines filters out sensitive headers."""
@@ -33,12 +52,19 @@ class TestLLMClient:
         header_lines = client.get_header_lines(headers)
 
         # Should include non-sensitive headers
-        assert "content-type: application/json" in header_lines
-        assert "user-agent: test-agent" in header_lines
+        assert b"content-type: application/json" in header_lines
+        assert b"user-agent: test-agent" in header_lines
 
         # Should exclude sensitive headers
-        assert not any("authorization" in line.lower() for line in header_lines)
-        assert not any("basic" in line.lower() for line in header_lines)
+        assert not any(b"authorization" in line.lower() for line in header_lines)
+        assert not any(b"basic" in line.lower() for line in header_lines)
+
+    def test_get_header_lines_filters_mixed_case_headers(self, mock_config):
+        """Test that sensitive headers are filtered regardless of their case."""
+        client = LLMClient(config=mock_config)
+        headers = Headers({"Authorization": "Bearer secret-token", "X-Id": "1"})
+
+        assert client.get_header_lines(headers) == [b"x-id: 1"]
 
     def test_get_header_lines_empty_headers(self, mock_config):
         """Test get_header_lines with empty headers."""
@@ -78,6 +104,39 @@ class TestLLMClient:
         assert result["content"]["test"] == "data"
         assert result["status_code"] == 200
 
+    def test_sanitize_response_with_plain_code_block(self, mock_config):
+        """Test sanitize_response with JSON in a code block without a language."""
+        client = LLMClient(config=mock_config)
+
+        response = {
+            "choices": [
+                {
+                    "message": {
+                        "content": '```\n{"content": "a\\n```b", "status_code": 200, "headers": {}}```'
+                    }
+                }
+            ]
+        }
+
+        result = client.sanitize_response(response)
+
+        assert result["content"] == "a\n```b"
+        assert result["status_code"] == 200
+
+        response["choices"][0]["message"]["content"] = (
+            '```json\n{"content": "a", "status_code": 200, "headers": {}}\n```\n'
+        )
+
+        assert client.sanitize_response(response)["content"] == "a"
+
+    def test_get_message_strips_code_fences(self, mock_config):
+        """Test that get_message returns the raw model output without fences."""
+        client = LLMClient(config=mock_config)
+
+        response = {"choices": [{"message": {"content": '```json\n{"a": 1}\n```'}}]}
+
+        assert client.get_message(response) == '{"a": 1}'
+
     def test_sanitize_response_extracts_message_content(self, mock_config):
         """Test that sanitize_response correctly extracts message content."""
         client = LLMClient(config=mock_config)
@@ -113,7 +172,9 @@ class TestLLMClient:
 
         # Create properly mocked aiohttp session
         mock_response = AsyncMock()
-        mock_response.json = AsyncMock(return_value=mock_llm_response)
+        mock_response.read = AsyncMock(
+            return_value=json.dumps(mock_llm_response).encode()
+        )
 
         mock_post_ctx = AsyncMock()
         mock_post_ctx.__aenter__ = AsyncMock(return_value=mock_response)
@@ -156,7 +217,7 @@ class TestLLMClient:
             assert call_args[0][0] == "v1/chat/completions"
 
             # Verify payload structure
-            payload = json.loads(call_args[1]["data"])
+            payload = orjson.loads(call_args[1]["data"])
             assert payload["model"] == mock_config.model
             assert "messages" in payload
 
@@ -177,20 +238,109 @@ class TestLLMClient:
             assert "content-type" in response.headers
 
     @pytest.mark.asyncio
-    async def test_get_response_uses_lock(
+    async def test_get_response_does_not_serialize_requests(
+        self, mock_config, mock_llm_response
+    ):
+        """Test that concurrent requests reach the LLM API in parallel."""
+        client = LLMClient(config=mock_config)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def slow_read():
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return json.dumps(mock_llm_response).encode()
+
+        mock_session = create_mock_aiohttp_session(mock_llm_response)
+        mock_response = await mock_session.post.return_value.__aenter__()
+        mock_response.read = AsyncMock(side_effect=slow_read)
+
+        requests = []
+        for path in ["/pet/1", "/pet/2"]:
+            request = MagicMock(spec=Request)
+            request.method = "GET"
+            request.scope = {"path": path}
+            request.headers = Headers({})
+            request.body = AsyncMock(return_value=b"")
+            request.state.messages = []
+            requests.append(request)
+
+        with patch("aiohttp.ClientSession", return_value=mock_session):
+            await asyncio.gather(*(client.get_response(r) for r in requests))
+
+        assert max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_get_response_keeps_exchanges_paired(
         self, mock_config, mock_request, mock_llm_response
     ):
-        """Test that get_response uses asyncio lock."""
+        """Test that each user message is directly followed by its reply."""
         client = LLMClient(config=mock_config)
 
+        async def slow_read():
+            await asyncio.sleep(0.01)
+            return json.dumps(mock_llm_response).encode()
+
         mock_session = create_mock_aiohttp_session(mock_llm_response)
+        mock_response = await mock_session.post.return_value.__aenter__()
+        mock_response.read = AsyncMock(side_effect=slow_read)
 
         with patch("aiohttp.ClientSession", return_value=mock_session):
-            with patch.object(
-                client.lock, "acquire", wraps=client.lock.acquire
-            ) as mock_acquire:
-                await client.get_response(mock_request)
-                mock_acquire.assert_called_once()
+            await asyncio.gather(
+                client.get_response(mock_request),
+                client.get_response(mock_request),
+            )
+
+        roles = [message["role"] for message in mock_request.state.messages]
+        assert roles == ["user", "assistant", "user", "assistant"]
+
+    @pytest.mark.asyncio
+    async def test_get_response_defaults_to_json_media_type(
+        self, mock_config, mock_request
+    ):
+        """Test that responses without a content-type are served as JSON."""
+        client = LLMClient(config=mock_config)
+
+        llm_response = {
+            "choices": [
+                {
+                    "message": {
+                        "content": '{"content": [1, 2], "status_code": 200, "headers": {}}'
+                    }
+                }
+            ]
+        }
+        mock_session = create_mock_aiohttp_session(llm_response)
+
+        with patch("aiohttp.ClientSession", return_value=mock_session):
+            response = await client.get_response(mock_request)
+
+        assert response.body == b"[1,2]"
+        assert response.headers["content-type"] == "application/json"
+
+    @pytest.mark.asyncio
+    async def test_get_response_stores_model_output_as_assistant_message(
+        self, mock_config, mock_request
+    ):
+        """Test that the assistant turn keeps the model output without its fences."""
+        client = LLMClient(config=mock_config)
+
+        message = '{"content": {}, "status_code": 204, "headers": {}}'
+        llm_response = {
+            "choices": [{"message": {"content": f"```json\n{message}\n```"}}]
+        }
+        mock_session = create_mock_aiohttp_session(llm_response)
+
+        with patch("aiohttp.ClientSession", return_value=mock_session):
+            await client.get_response(mock_request)
+
+        assert mock_request.state.messages[1] == {
+            "role": "assistant",
+            "content": message,
+        }
 
     @pytest.mark.asyncio
     async def test_get_response_includes_request_body(
@@ -201,7 +351,7 @@ class TestLLMClient:
 
         request = MagicMock(spec=Request)
         request.method = "POST"
-        request.url.path = "/pet"
+        request.scope = {"path": "/pet"}
         request.headers = Headers({"content-type": "application/json"})
         request.body = AsyncMock(
             return_value=b'{"name": "Fluffy", "status": "available"}'
@@ -244,7 +394,7 @@ class TestLLMClient:
 
         request = MagicMock(spec=Request)
         request.method = "GET"
-        request.url.path = "/test"
+        request.scope = {"path": "/test"}
         request.headers = Headers({"x-custom-header": "custom-value"})
         request.body = AsyncMock(return_value=b"")
         request.state.messages = []
@@ -256,3 +406,70 @@ class TestLLMClient:
 
             user_message = request.state.messages[0]
             assert "x-custom-header: custom-value" in user_message["content"]
+
+    @pytest.mark.asyncio
+    async def test_get_response_reuses_session(
+        self, mock_config, mock_request, mock_llm_response
+    ):
+        """Test that get_response reuses a single pooled session."""
+        client = LLMClient(config=mock_config)
+
+        mock_session = create_mock_aiohttp_session(mock_llm_response)
+
+        with patch("aiohttp.ClientSession", return_value=mock_session) as mock_cls:
+            await client.get_response(mock_request)
+            await client.get_response(mock_request)
+
+            mock_cls.assert_called_once()
+            assert mock_session.post.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_close_closes_session(
+        self, mock_config, mock_request, mock_llm_response
+    ):
+        """Test that close releases the pooled session."""
+        client = LLMClient(config=mock_config)
+
+        mock_session = create_mock_aiohttp_session(mock_llm_response)
+
+        with patch("aiohttp.ClientSession", return_value=mock_session):
+            await client.get_response(mock_request)
+            await client.close()
+
+            mock_session.close.assert_awaited_once()
+            assert client._session is None
+
+    def test_get_user_content_formats_http_request(self, mock_config):
+        """Test that get_user_content renders the request as raw HTTP text."""
+        client = LLMClient(config=mock_config)
+
+        request = MagicMock(spec=Request)
+        request.method = "POST"
+        request.scope = {"path": "/pet"}
+        request.headers = Headers(
+            {"content-type": "application/json", "authorization": "Bearer x"}
+        )
+
+        content = client.get_user_content(request, b'{"name": "Fluffy"}')
+
+        assert content == "\r\n".join(
+            [
+                "POST /pet HTTP/1.1",
+                "content-type: application/json",
+                '{"name": "Fluffy"}',
+            ]
+        )
+
+    def test_get_user_content_tolerates_non_utf8_body(self, mock_config):
+        """Test that get_user_content does not fail on binary bodies."""
+        client = LLMClient(config=mock_config)
+
+        request = MagicMock(spec=Request)
+        request.method = "PUT"
+        request.scope = {"path": "/upload"}
+        request.headers = Headers({})
+
+        content = client.get_user_content(request, b"\xff\xfe")
+
+        assert content.startswith("PUT /upload HTTP/1.1\r\n")
+        assert content.endswith("\ufffd\ufffd")
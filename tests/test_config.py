@@ -1,11 +1,30 @@
+import asyncio
 import json
+import orjson
 import pytest
 from pathlib import Path
-from unittest.mock import AsyncMock, patch, mock_open, MagicMock
-from llmockapi.config import Config, SYSTEM_PROMPT
+from unittest.mock import AsyncMock, patch, MagicMock
+import yaml
+from llmockapi.config import (
+    Config,
+    CHAT_TEMPLATE_PATH,
+    SYSTEM_PROMPT,
+    SYSTEM_PROMPT_PREFIX,
+    SYSTEM_PROMPT_SUFFIX,
+    YAML_LOADER,
+    _read_chat_template,
+)
 from conftest import create_mock_aiohttp_session
 
 
+@pytest.fixture
+def clear_chat_template_cache():
+    """Make sure the memoized chat template does not leak between tests."""
+    _read_chat_template.cache_clear()
+    yield
+    _read_chat_template.cache_clear()
+
+
 @pytest.mark.unit
 class TestConfig:
     """Test suite for Config class."""
@@ -55,16 +74,84 @@ class TestConfig:
 
         with patch("aiohttp.ClientSession", return_value=mock_session):
             result = await mock_config.get_http_spec()
-            assert result == test_spec
+            assert result == {"swagger": "2.0", "info": {"title": "Test API"}}
+
+    @pytest.mark.asyncio
+    async def test_get_http_spec_yaml(self, mock_config):
+        """Test that YAML specs fetched over HTTP are parsed by URL path."""
+        mock_config.mock_api_spec = "https://example.com/spec.yaml?ref=main"
+        mock_session = create_mock_aiohttp_session('swagger: "2.0"\n')
+
+        with patch("aiohttp.ClientSession", return_value=mock_session):
+            result = await mock_config.get_http_spec()
+            assert result == {"swagger": "2.0"}
+
+    @pytest.mark.asyncio
+    async def test_get_http_spec_plain_text(self, mock_config):
+        """Test that specs without a known extension are returned as text."""
+        mock_config.mock_api_spec = "https://example.com/spec"
+        mock_session = create_mock_aiohttp_session("GET /pet returns a pet")
+
+        with patch("aiohttp.ClientSession", return_value=mock_session):
+            result = await mock_config.get_http_spec()
+            assert result == "GET /pet returns a pet"
+
+    @pytest.mark.asyncio
+    async def test_get_http_spec_uses_disk_cache(self, tmp_path):
+        """Test that a fetched spec is persisted and reused across instances."""
+        test_spec = '{"swagger": "2.0"}'
+        config_args = {
+            "mock_api_spec": "https://example.com/spec.json",
+            "spec_cache_dir": str(tmp_path / "cache"),
+        }
+
+        mock_session = create_mock_aiohttp_session(test_spec)
+        with patch("aiohttp.ClientSession", return_value=mock_session):
+            assert await Config(**config_args).get_http_spec() == {"swagger": "2.0"}
+
+        cache_path = Config(**config_args).get_spec_cache_path()
+        assert cache_path.parent == tmp_path / "cache"
+        assert cache_path.read_text() == test_spec
+        assert list(cache_path.parent.iterdir()) == [cache_path]
+
+        with patch("aiohttp.ClientSession") as mock_cls:
+            assert await Config(**config_args).get_http_spec() == {"swagger": "2.0"}
+            mock_cls.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_http_spec_failed_cache_write_leaves_no_file(self, tmp_path):
+        """Test that an interrupted cache write leaves no partial spec behind."""
+        config = Config(
+            mock_api_spec="https://example.com/spec.json",
+            spec_cache_dir=str(tmp_path / "cache"),
+        )
+        cache_path = config.get_spec_cache_path()
+        cache_path.parent.mkdir()
+
+        mock_session = create_mock_aiohttp_session('{"swagger": "2.0"}')
+        with (
+            patch("aiohttp.ClientSession", return_value=mock_session),
+            patch("llmockapi.config.os.replace", side_effect=OSError),
+        ):
+            with pytest.raises(OSError):
+                await config.get_http_spec()
 
-    def test_get_local_spec_json(self, mock_config, api_spec_json):
+        assert list(cache_path.parent.iterdir()) == []
+
+    def test_get_spec_cache_path_disabled_by_default(self, mock_config):
+        """Test that specs are not cached on disk unless configured."""
+        assert mock_config.get_spec_cache_path() is None
+
+    @pytest.mark.asyncio
+    async def test_get_local_spec_json(self, mock_config, api_spec_json):
         """Test getting local JSON API spec."""
-        result = mock_config.get_local_spec()
+        result = await mock_config.get_local_spec()
         assert isinstance(result, dict)
         assert "swagger" in result
         assert result["swagger"] == "2.0"
 
-    def test_get_local_spec_yaml(self, tmp_path):
+    @pytest.mark.asyncio
+    async def test_get_local_spec_yaml(self, tmp_path):
         """Test getting local YAML API spec."""
         yaml_content = """
 swagger: "2.0"
@@ -81,12 +168,38 @@ info:
             mock_api_spec=str(yaml_file),
         )
 
-        result = config.get_local_spec()
+        result = await config.get_local_spec()
         assert isinstance(result, dict)
         assert result["swagger"] == "2.0"
         assert result["info"]["title"] == "Test API"
 
-    def test_get_local_spec_plain_text(self, tmp_path):
+    @pytest.mark.asyncio
+    async def test_get_local_spec_yml_extension(self, tmp_path):
+        """Test that .yml specs are parsed as YAML too."""
+        yaml_file = tmp_path / "spec.yml"
+        yaml_file.write_text('openapi: "3.0.0"\n')
+
+        config = Config(mock_api_spec=str(yaml_file))
+
+        assert await config.get_local_spec() == {"openapi": "3.0.0"}
+
+    @pytest.mark.asyncio
+    async def test_get_local_spec_yaml_uses_libyaml_loader(self, tmp_path):
+        """Test that YAML specs are parsed with the configured fast loader."""
+        yaml_file = tmp_path / "spec.yaml"
+        yaml_file.write_text("swagger: '2.0'\n")
+
+        config = Config(mock_api_spec=str(yaml_file))
+
+        with patch("llmockapi.config.yaml.load", wraps=yaml.load) as mock_load:
+            await config.get_local_spec()
+
+        assert mock_load.call_args.kwargs["Loader"] is YAML_LOADER
+        if yaml.__with_libyaml__:
+            assert YAML_LOADER is yaml.CSafeLoader
+
+    @pytest.mark.asyncio
+    async def test_get_local_spec_plain_text(self, tmp_path):
         """Test getting local plain text spec."""
         text_content = "This is a plain text spec"
         text_file = tmp_path / "spec.txt"
@@ -98,7 +211,7 @@ info:
             mock_api_spec=str(text_file),
         )
 
-        result = config.get_local_spec()
+        result = await config.get_local_spec()
         assert result == text_content
 
     @pytest.mark.asyncio
@@ -113,6 +226,32 @@ info:
         assert result2 == result1
         assert mock_config._api_spec == result1
 
+    @pytest.mark.asyncio
+    async def test_get_api_spec_caches_empty_spec(self, tmp_path):
+        """Test that an empty spec is cached rather than re-read."""
+        text_file = tmp_path / "spec.txt"
+        text_file.write_text("")
+        config = Config(mock_api_spec=str(text_file))
+
+        assert await config.get_api_spec() == ""
+
+        with patch.object(Config, "get_local_spec") as mock_get_local_spec:
+            assert await config.get_api_spec() == ""
+            mock_get_local_spec.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_api_spec_caches_empty_yaml_spec(self, tmp_path):
+        """Test that an empty YAML spec, which parses to None, is cached."""
+        yaml_file = tmp_path / "spec.yaml"
+        yaml_file.write_text("")
+        config = Config(mock_api_spec=str(yaml_file))
+
+        assert await config.get_api_spec() is None
+
+        with patch.object(Config, "get_local_spec") as mock_get_local_spec:
+            assert await config.get_api_spec() is None
+            mock_get_local_spec.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_get_api_spec_http(self):
         """Test get_api_spec with HTTP URL."""
@@ -127,7 +266,7 @@ info:
 
         with patch("aiohttp.ClientSession", return_value=mock_session):
             result = await config.get_api_spec()
-            assert result == test_spec
+            assert result == {"test": "spec"}
 
     @pytest.mark.asyncio
     async def test_get_api_spec_local(self, mock_config, api_spec_json):
@@ -136,6 +275,60 @@ info:
         assert isinstance(result, dict)
         assert "swagger" in result
 
+    @pytest.mark.asyncio
+    async def test_get_api_spec_local_runs_in_thread(self, mock_config):
+        """Test that local spec parsing is offloaded from the event loop."""
+        with patch(
+            "llmockapi.config.asyncio.to_thread", wraps=asyncio.to_thread
+        ) as mock_to_thread:
+            result = await mock_config.get_api_spec()
+
+        mock_to_thread.assert_called_once_with(mock_config._read_local_spec)
+        assert result["swagger"] == "2.0"
+
+    @pytest.mark.asyncio
+    async def test_get_api_spec_missing_file_is_cached(self, tmp_path):
+        """Test that a missing local spec is only looked up once."""
+        config = Config(mock_api_spec=str(tmp_path / "missing.json"))
+
+        with patch(
+            "llmockapi.config.asyncio.to_thread", wraps=asyncio.to_thread
+        ) as mock_to_thread:
+            with pytest.raises(FileNotFoundError):
+                await config.get_api_spec()
+            with pytest.raises(FileNotFoundError):
+                await config.get_api_spec()
+
+        mock_to_thread.assert_called_once_with(config._read_local_spec)
+
+    @pytest.mark.asyncio
+    async def test_get_api_spec_does_not_cache_transient_errors(self, tmp_path):
+        """Test that errors other than a missing spec file are retried."""
+        config = Config(mock_api_spec=str(tmp_path / "spec.json"))
+
+        with patch.object(Config, "_read_local_spec", side_effect=PermissionError):
+            with pytest.raises(PermissionError):
+                await config.get_api_spec()
+
+        (tmp_path / "spec.json").write_text('{"swagger": "2.0"}')
+
+        assert await config.get_api_spec() == {"swagger": "2.0"}
+
+    @pytest.mark.asyncio
+    async def test_get_api_spec_cached_error_traceback_does_not_grow(self, tmp_path):
+        """Test that re-raising a cached spec error starts a fresh traceback."""
+        config = Config(mock_api_spec=str(tmp_path / "missing.json"))
+        with pytest.raises(FileNotFoundError):
+            await config.get_api_spec()
+
+        depths = []
+        for _ in range(2):
+            with pytest.raises(FileNotFoundError) as exc_info:
+                await config.get_api_spec()
+            depths.append(len(exc_info.traceback))
+
+        assert depths[0] == depths[1]
+
     @pytest.mark.asyncio
     async def test_get_system_prompt(self, mock_config):
         """Test system prompt generation."""
@@ -145,26 +338,112 @@ info:
         assert "<spec>" in system_prompt
         assert "</spec>" in system_prompt
 
-        # Should contain the API spec
+        # Should contain the API spec as JSON
         api_spec = await mock_config.get_api_spec()
-        assert str(api_spec) in system_prompt
+        assert orjson.dumps(api_spec).decode() in system_prompt
+
+    @pytest.mark.asyncio
+    async def test_get_system_prompt_uses_precomputed_parts(self, tmp_path):
+        """Test that the prompt is the precomputed prefix, spec and suffix."""
+        text_file = tmp_path / "spec.txt"
+        text_file.write_text("GET /pet returns a pet")
+
+        config = Config(mock_api_spec=str(text_file))
+        system_prompt = await config.get_system_prompt()
 
-    def test_get_chat_template(self, mock_config):
+        assert system_prompt.startswith(SYSTEM_PROMPT_PREFIX)
+        assert system_prompt.endswith(SYSTEM_PROMPT_SUFFIX)
+        assert system_prompt == (
+            f"{SYSTEM_PROMPT}\n\n<spec>GET /pet returns a pet</spec>"
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_system_prompt_yaml_spec_with_non_string_keys(self, tmp_path):
+        """Test that YAML specs with integer keys are embedded as JSON."""
+        yaml_file = tmp_path / "spec.yaml"
+        yaml_file.write_text("responses:\n  200:\n    description: OK\n")
+
+        config = Config(mock_api_spec=str(yaml_file))
+        system_prompt = await config.get_system_prompt()
+
+        assert '<spec>{"responses":{"200":{"description":"OK"}}}</spec>' in system_prompt
+
+    @pytest.mark.asyncio
+    async def test_get_system_prompt_plain_text_spec(self, tmp_path):
+        """Test that plain text specs are embedded unchanged."""
+        text_file = tmp_path / "spec.txt"
+        text_file.write_text("GET /pet returns a pet")
+
+        config = Config(mock_api_spec=str(text_file))
+        system_prompt = await config.get_system_prompt()
+
+        assert "<spec>GET /pet returns a pet</spec>" in system_prompt
+
+    @pytest.mark.asyncio
+    async def test_get_system_prompt_caches_result(self, mock_config):
+        """Test that the system prompt is only built once."""
+        system_prompt = await mock_config.get_system_prompt()
+
+        with patch.object(Config, "get_api_spec") as mock_get_api_spec:
+            assert await mock_config.get_system_prompt() is system_prompt
+            mock_get_api_spec.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_system_message(self, mock_config):
+        """Test that the system message is built once and shared."""
+        message = await mock_config.get_system_message()
+
+        assert message == {
+            "role": "system",
+            "content": await mock_config.get_system_prompt(),
+        }
+        assert await mock_config.get_system_message() is message
+
+    def test_get_chat_template(self, tmp_path, clear_chat_template_cache):
         """Test getting chat template."""
-        # Create a mock chat template file
-        with patch("builtins.open", mock_open(read_data="<html>Chat Template</html>")):
-            template = mock_config.get_chat_template()
-            assert template == "<html>Chat Template</html>"
+        template_file = tmp_path / "chat.html"
+        template_file.write_text("<html>Chat Template</html>")
+        config = Config(chat_template_path=str(template_file))
+
+        template = config.get_chat_template()
+        assert template == b"<html>Chat Template</html>"
 
-            # Second call should return cached value
-            template2 = mock_config.get_chat_template()
-            assert template2 == template
+        # Second call should return cached value
+        template2 = config.get_chat_template()
+        assert template2 is template
 
-    def test_get_chat_template_caching(self, mock_config):
+    def test_get_chat_template_caching(self, tmp_path, clear_chat_template_cache):
         """Test that chat template is cached."""
-        with patch("builtins.open", mock_open(read_data="<html>Template</html>")):
-            template1 = mock_config.get_chat_template()
-            template2 = mock_config.get_chat_template()
+        template_file = tmp_path / "chat.html"
+        template_file.write_text("<html>Template</html>")
+
+        template1 = Config(chat_template_path=str(template_file)).get_chat_template()
+        template_file.write_text("<html>Changed</html>")
+        template2 = Config(chat_template_path=str(template_file)).get_chat_template()
+
+        assert template1 == template2 == b"<html>Template</html>"
+
+    def test_get_chat_template_parts_missing_placeholder(
+        self, tmp_path, clear_chat_template_cache
+    ):
+        """Test that a template without the chat data placeholder is rejected."""
+        template_file = tmp_path / "chat.html"
+        template_file.write_text("<html></html>")
+        config = Config(chat_template_path=str(template_file))
+
+        with pytest.raises(ValueError, match="const chatData"):
+            config.get_chat_template_parts()
+
+    def test_chat_template_path_default(self, mock_config):
+        """Test that the bundled chat template is used by default."""
+        assert mock_config.chat_template_path == CHAT_TEMPLATE_PATH
+
+    def test_get_chat_template_parts(self, mock_config):
+        """Test that the chat template is split around the chat data placeholder."""
+        template = b"<script>const chatData = [];</script>"
+        with patch.object(Config, "get_chat_template", return_value=template):
+            prefix, suffix = mock_config.get_chat_template_parts()
 
-            assert template1 == template2
-            assert mock_config._chat_template == "<html>Template</html>"
+        assert prefix == b"<script>"
+        assert suffix == b"</script>"
+        assert mock_config.get_chat_template_parts() == (prefix, suffix)
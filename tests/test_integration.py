@@ -2,7 +2,9 @@ import json
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi.testclient import TestClient
-from llmockapi import app
+from fastapi.middleware.gzip import GZipMiddleware
+from llmockapi import app, main
+from llmockapi.config import Config
 from conftest import create_mock_aiohttp_session
 
 
@@ -21,6 +23,19 @@ class TestAppIntegration:
         # Check that middleware is registered
         assert len(app.user_middleware) > 0
 
+    def test_app_has_gzip_middleware(self):
+        """Test that responses are compressed by the outermost middleware."""
+        assert app.user_middleware[0].cls is GZipMiddleware
+
+    def test_large_responses_are_gzipped(self, test_client):
+        """Test that large responses are gzip encoded for clients that accept it."""
+        response = test_client.get(
+            "/__internal/ui", headers={"accept-encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "chatData" in response.text
+
     def test_app_has_internal_routes(self, test_client):
         """Test that app has internal routes configured."""
         response = test_client.get("/__internal/health")
@@ -68,6 +83,23 @@ class TestAppIntegration:
             assert len(messages) >= 1
             assert messages[0]["role"] == "system"
 
+    def test_lifespan_shares_system_message(self):
+        """Test that every lifespan seeds history with the same system message."""
+        from llmockapi import config
+
+        with TestClient(app) as client:
+            first = client.app_state["messages"][0]
+        with TestClient(app) as client:
+            second = client.app_state["messages"][0]
+
+        assert first is second is config._system_message
+
+    def test_client_starts_from_system_message(self, test_client):
+        """Test that each test sees only the system message in the history."""
+        messages = test_client.get("/__internal/messages").json()
+
+        assert [message["role"] for message in messages] == ["system"]
+
     def test_multiple_requests_share_conversation(self, test_client, mock_llm_response):
         """Test that multiple requests maintain conversation history."""
         mock_session = create_mock_aiohttp_session(mock_llm_response)
@@ -92,6 +124,21 @@ class TestAppIntegration:
             # Should have more messages after second request
             assert second_count > first_count
 
+    def test_main_runs_uvicorn(self):
+        """Test that main starts uvicorn with the configured options."""
+        config = Config(host="0.0.0.0", port=8080)
+
+        with patch("uvicorn.run") as mock_run:
+            main(config)
+
+        mock_run.assert_called_once_with(
+            "llmockapi:app",
+            host="0.0.0.0",
+            port=8080,
+            http="httptools",
+            reload=False,
+        )
+
     def test_app_root_path_configuration(self):
         """Test that app is configured with correct root path."""
         assert app.root_path == "/__internal"
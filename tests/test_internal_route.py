@@ -1,9 +1,10 @@
-import json
+import orjson
 import pytest
+from pathlib import Path
 from unittest.mock import MagicMock, patch, mock_open
 from fastapi import Request
 from fastapi.testclient import TestClient
-from llmockapi.internal_route import router, health, messages, ui
+from llmockapi.internal_route import MessagesEncoder, router, health, messages, ui
 
 
 @pytest.mark.unit
@@ -29,9 +30,32 @@ class TestInternalRoutes:
 
         response = await messages(request)
 
-        # Should return JSONResponse with messages
-        # Parse both as JSON to compare content, not formatting
-        assert json.loads(response.body.decode()) == test_messages
+        # Should return JSON with messages
+        # Parse the body to compare content, not formatting
+        assert orjson.loads(response.body) == test_messages
+
+    @pytest.mark.asyncio
+    async def test_messages_endpoint_serializes_with_orjson(self):
+        """Test messages endpoint returns compact JSON and stringifies unknown types."""
+        request = MagicMock(spec=Request)
+        request.state.messages = [{"role": "user", "content": Path("/pet")}]
+
+        response = await messages(request)
+
+        assert response.media_type == "application/json"
+        assert response.body == b'[{"role":"user","content":"/pet"}]'
+
+    @pytest.mark.asyncio
+    async def test_ui_endpoint_stringifies_unknown_types(self):
+        """Test UI endpoint embeds values orjson cannot encode natively as strings."""
+        request = MagicMock(spec=Request)
+        request.state.messages = [{"role": "user", "content": Path("/pet")}]
+
+        with patch("llmockapi.internal_route.config") as mock_config:
+            mock_config.get_chat_template_parts.return_value = (b"", b"")
+            response = await ui(request)
+
+        assert response.body == b'const chatData = [{"role":"user","content":"/pet"}];'
 
     @pytest.mark.asyncio
     async def test_messages_endpoint_empty_state(self):
@@ -41,7 +65,7 @@ class TestInternalRoutes:
 
         response = await messages(request)
 
-        assert response.body.decode() == "[]"
+        assert orjson.loads(response.body) == []
 
     @pytest.mark.asyncio
     async def test_ui_endpoint_renders_template(self):
@@ -53,10 +77,10 @@ class TestInternalRoutes:
         ]
         request.state.messages = test_messages
 
-        template_content = "<html><script>const chatData = [];</script></html>"
+        template_parts = (b"<html><script>", b"</script></html>")
 
         with patch("llmockapi.internal_route.config") as mock_config:
-            mock_config.get_chat_template.return_value = template_content
+            mock_config.get_chat_template_parts.return_value = template_parts
             response = await ui(request)
 
             # Should be HTMLResponse
@@ -77,10 +101,10 @@ class TestInternalRoutes:
             {"role": "user", "content": "Test with 'quotes'"},
         ]
 
-        template_content = "const chatData = [];"
+        template_parts = (b"", b"")
 
         with patch("llmockapi.internal_route.config") as mock_config:
-            mock_config.get_chat_template.return_value = template_content
+            mock_config.get_chat_template_parts.return_value = template_parts
             response = await ui(request)
 
             body = response.body
@@ -102,16 +126,79 @@ class TestInternalRoutes:
             },
         ]
 
-        template_content = "<div>const chatData = [];</div>"
+        template_parts = (b"<div>", b"</div>")
 
         with patch("llmockapi.internal_route.config") as mock_config:
-            mock_config.get_chat_template.return_value = template_content
+            mock_config.get_chat_template_parts.return_value = template_parts
             response = await ui(request)
 
             body = response.body
             assert b"const chatData = [" in body
             # Original placeholder should be replaced
             assert b"const chatData = [];" not in body
+            assert body.startswith(b"<div>const chatData = [{")
+            assert body.endswith(b"}];</div>")
+
+
+@pytest.mark.unit
+class TestMessagesEncoder:
+    """Test suite for MessagesEncoder class."""
+
+    def test_encode_matches_orjson(self):
+        """Test that the encoded history equals a full orjson dump."""
+        encoder = MessagesEncoder()
+        history = [
+            {"role": "system", "content": "System prompt"},
+            {"role": "user", "content": "Test request"},
+        ]
+
+        assert encoder.encode([]) == b"[]"
+        assert encoder.encode(history) == orjson.dumps(history)
+
+    def test_encode_only_serializes_new_messages(self):
+        """Test that messages already encoded are not serialized again."""
+        encoder = MessagesEncoder()
+        history = [{"role": "system", "content": "System prompt"}]
+        encoder.encode(history)
+
+        history.append({"role": "user", "content": "Test request"})
+        with patch(
+            "llmockapi.internal_route.orjson.dumps", wraps=orjson.dumps
+        ) as mock_dumps:
+            result = encoder.encode(history)
+
+        mock_dumps.assert_called_once_with(history[1], default=str)
+        assert result == orjson.dumps(history)
+
+    def test_encode_resets_for_a_new_history(self):
+        """Test that a different history list is encoded from scratch."""
+        encoder = MessagesEncoder()
+        encoder.encode([{"role": "system", "content": "old"}])
+
+        history = [{"role": "system", "content": "new"}]
+
+        assert encoder.encode(history) == orjson.dumps(history)
+
+    def test_encode_resets_after_truncate_and_grow(self):
+        """Test that a history truncated and regrown in place is re-encoded."""
+        encoder = MessagesEncoder()
+        history = [
+            {"role": "system", "content": "System prompt"},
+            {"role": "user", "content": "old1"},
+            {"role": "assistant", "content": "old2"},
+        ]
+        encoder.encode(history)
+
+        del history[1:]
+        history.extend(
+            [
+                {"role": "user", "content": "n1"},
+                {"role": "assistant", "content": "n2"},
+                {"role": "user", "content": "n3"},
+            ]
+        )
+
+        assert encoder.encode(history) == orjson.dumps(history)
 
 
 @pytest.mark.integration
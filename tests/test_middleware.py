@@ -1,8 +1,10 @@
+import asyncio
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, PropertyMock, patch
 from fastapi import Request, Response
 from llmockapi.middleware import MockResponseMiddleWare
 from llmockapi.config import Config
+from conftest import make_request
 
 
 @pytest.mark.unit
@@ -14,14 +16,14 @@ class TestMockResponseMiddleWare:
         middleware = MockResponseMiddleWare(config=mock_config)
         assert middleware.llm_client is not None
         assert middleware.llm_client.config == mock_config
+        assert middleware.cache.maxsize == mock_config.cache_size
 
     @pytest.mark.asyncio
     async def test_middleware_bypasses_internal_routes(self, mock_config):
         """Test that middleware bypasses /__internal routes."""
         middleware = MockResponseMiddleWare(config=mock_config)
 
-        request = MagicMock(spec=Request)
-        request.url.path = "/__internal/health"
+        request = make_request("/__internal/health")
 
         call_next = AsyncMock(return_value=Response(content="OK", status_code=200))
 
@@ -36,8 +38,7 @@ class TestMockResponseMiddleWare:
         """Test that middleware bypasses /favicon.ico requests."""
         middleware = MockResponseMiddleWare(config=mock_config)
 
-        request = MagicMock(spec=Request)
-        request.url.path = "/favicon.ico"
+        request = make_request("/favicon.ico")
 
         call_next = AsyncMock(return_value=Response(content="", status_code=404))
 
@@ -46,6 +47,42 @@ class TestMockResponseMiddleWare:
         # Should call next handler
         call_next.assert_called_once_with(request)
 
+    @pytest.mark.asyncio
+    async def test_middleware_bypasses_robots_txt(self, mock_config):
+        """Test that middleware bypasses /robots.txt requests."""
+        middleware = MockResponseMiddleWare(config=mock_config)
+
+        request = make_request("/robots.txt")
+
+        call_next = AsyncMock(return_value=Response(content="", status_code=404))
+
+        with patch.object(middleware.llm_client, "get_response") as mock_llm:
+            await middleware(request, call_next)
+
+            call_next.assert_called_once_with(request)
+            mock_llm.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_middleware_does_not_build_request_url(self, mock_config):
+        """Test that routing decisions only read the raw path from the scope."""
+        middleware = MockResponseMiddleWare(config=mock_config)
+        call_next = AsyncMock(return_value=Response(content="OK", status_code=200))
+
+        with (
+            patch.object(
+                Request, "url", new_callable=PropertyMock, side_effect=AssertionError
+            ),
+            patch.object(
+                middleware.llm_client,
+                "get_response",
+                AsyncMock(return_value=Response(content="OK", status_code=200)),
+            ),
+        ):
+            for path in ["/__internal/health", "/favicon.ico", "/pet/1"]:
+                response = await middleware(make_request(path), call_next)
+
+                assert response.status_code == 200
+
     @pytest.mark.asyncio
     async def test_middleware_processes_api_routes(
         self, mock_config, mock_llm_response
@@ -53,12 +90,7 @@ class TestMockResponseMiddleWare:
         """Test that middleware processes regular API routes with LLM."""
         middleware = MockResponseMiddleWare(config=mock_config)
 
-        request = MagicMock(spec=Request)
-        request.url.path = "/pet/123"
-        request.method = "GET"
-        request.headers = {}
-        request.body = AsyncMock(return_value=b"")
-        request.state.messages = []
+        request = make_request("/pet/123")
 
         call_next = AsyncMock()
 
@@ -80,12 +112,7 @@ class TestMockResponseMiddleWare:
         """Test that middleware calls LLM client for API routes."""
         middleware = MockResponseMiddleWare(config=mock_config)
 
-        request = MagicMock(spec=Request)
-        request.url.path = "/api/test"
-        request.method = "POST"
-        request.headers = {}
-        request.body = AsyncMock(return_value=b'{"test": "data"}')
-        request.state.messages = []
+        request = make_request("/api/test", method="POST", body=b'{"test": "data"}')
 
         call_next = AsyncMock()
 
@@ -113,8 +140,7 @@ class TestMockResponseMiddleWare:
         ]
 
         for path in internal_paths:
-            request = MagicMock(spec=Request)
-            request.url.path = path
+            request = make_request(path)
 
             response = await middleware(request, call_next)
 
@@ -130,12 +156,7 @@ class TestMockResponseMiddleWare:
         methods = ["GET", "POST", "PUT", "DELETE", "PATCH"]
 
         for method in methods:
-            request = MagicMock(spec=Request)
-            request.url.path = "/api/resource"
-            request.method = method
-            request.headers = {}
-            request.body = AsyncMock(return_value=b"")
-            request.state.messages = []
+            request = make_request("/api/resource", method=method)
 
             call_next = AsyncMock()
 
@@ -154,12 +175,9 @@ class TestMockResponseMiddleWare:
         """Test that middleware preserves request state."""
         middleware = MockResponseMiddleWare(config=mock_config)
 
-        request = MagicMock(spec=Request)
-        request.url.path = "/pet/1"
-        request.method = "GET"
-        request.headers = {}
-        request.body = AsyncMock(return_value=b"")
-        request.state.messages = [{"role": "system", "content": "test"}]
+        request = make_request(
+            "/pet/1", messages=[{"role": "system", "content": "test"}]
+        )
 
         call_next = AsyncMock()
 
@@ -172,3 +190,186 @@ class TestMockResponseMiddleWare:
 
             # State should be preserved
             assert len(request.state.messages) >= 1
+
+    @pytest.mark.asyncio
+    async def test_middleware_caches_get_responses(self, mock_config):
+        """Test that repeated GET requests are served from the cache."""
+        middleware = MockResponseMiddleWare(config=mock_config)
+
+        call_next = AsyncMock()
+
+        with patch.object(
+            middleware.llm_client,
+            "get_response",
+            AsyncMock(return_value=Response(content='{"id": 1}', status_code=200)),
+        ) as mock_get_response:
+            first = await middleware(
+                make_request("/pet/1", query_string=b"b=2&a=1"), call_next
+            )
+            second = await middleware(
+                make_request("/pet/1", query_string=b"a=1&b=2"), call_next
+            )
+
+            mock_get_response.assert_called_once()
+            assert second.status_code == first.status_code
+            assert second.body == first.body
+
+    @pytest.mark.asyncio
+    async def test_middleware_cache_key_includes_path(self, mock_config):
+        """Test that different paths do not share cached responses."""
+        middleware = MockResponseMiddleWare(config=mock_config)
+        call_next = AsyncMock()
+
+        with patch.object(
+            middleware.llm_client,
+            "get_response",
+            AsyncMock(return_value=Response(content="OK", status_code=200)),
+        ) as mock_get_response:
+            for path in ["/pet/1", "/pet/2"]:
+                await middleware(make_request(path), call_next)
+
+            assert mock_get_response.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_middleware_write_requests_invalidate_cache(self, mock_config):
+        """Test that non-GET requests bypass and clear the cache."""
+        middleware = MockResponseMiddleWare(config=mock_config)
+        call_next = AsyncMock()
+
+        with patch.object(
+            middleware.llm_client,
+            "get_response",
+            AsyncMock(return_value=Response(content="OK", status_code=200)),
+        ) as mock_get_response:
+            for method in ["GET", "POST", "POST", "GET"]:
+                await middleware(make_request("/pet", method=method), call_next)
+
+            assert mock_get_response.call_count == 4
+            assert len(middleware.cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_middleware_does_not_cache_reads_overlapping_writes(
+        self, mock_config
+    ):
+        """Test that a GET answered while a write is in flight is not cached."""
+        middleware = MockResponseMiddleWare(config=mock_config)
+        call_next = AsyncMock()
+        write_started = asyncio.Event()
+        finish_write = asyncio.Event()
+
+        async def get_response(request):
+            if request.method == "POST":
+                write_started.set()
+                await finish_write.wait()
+            return Response(content="OK", status_code=200)
+
+        with patch.object(
+            middleware.llm_client, "get_response", side_effect=get_response
+        ) as mock_get_response:
+            write = asyncio.create_task(
+                middleware(make_request("/pets", method="POST"), call_next)
+            )
+            await write_started.wait()
+
+            await middleware(make_request("/pets"), call_next)
+
+            finish_write.set()
+            await write
+            assert len(middleware.cache) == 0
+
+            await middleware(make_request("/pets"), call_next)
+            assert mock_get_response.call_count == 3
+            assert len(middleware.cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_middleware_does_not_cache_reads_spanning_writes(
+        self, mock_config
+    ):
+        """Test that a GET still in flight when a write finishes is not cached."""
+        middleware = MockResponseMiddleWare(config=mock_config)
+        call_next = AsyncMock()
+        read_started = asyncio.Event()
+        finish_read = asyncio.Event()
+
+        async def get_response(request):
+            if request.method == "GET":
+                read_started.set()
+                await finish_read.wait()
+            return Response(content="OK", status_code=200)
+
+        with patch.object(
+            middleware.llm_client, "get_response", side_effect=get_response
+        ):
+            read = asyncio.create_task(middleware(make_request("/pets"), call_next))
+            await read_started.wait()
+
+            await middleware(make_request("/pets", method="POST"), call_next)
+
+            finish_read.set()
+            await read
+            assert len(middleware.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_middleware_close(self, mock_config):
+        """Test that close clears the cache and closes the LLM client."""
+        middleware = MockResponseMiddleWare(config=mock_config)
+        middleware.cache.set(b"key", Response(content="OK"))
+
+        with patch.object(
+            middleware.llm_client, "close", AsyncMock()
+        ) as mock_close:
+            await middleware.close()
+
+            mock_close.assert_awaited_once()
+            assert len(middleware.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_get_cache_key(self, mock_config):
+        """Test that the cache key covers method, path, query, headers and body."""
+        middleware = MockResponseMiddleWare(config=mock_config)
+
+        async def get_cache_key(
+            method="GET", path="/pet", query=b"", body=b"", headers=None
+        ):
+            return await middleware.get_cache_key(
+                make_request(
+                    path,
+                    method=method,
+                    body=body,
+                    headers=headers,
+                    query_string=query,
+                )
+            )
+
+        key = await get_cache_key(query=b"a=1&b=2")
+
+        assert len(key) == 16
+        assert key == await get_cache_key(query=b"b=2&a=1")
+        assert key != await get_cache_key(query=b"a=1")
+        assert key != await get_cache_key(method="HEAD", query=b"a=1&b=2")
+        assert key != await get_cache_key(path="/pets", query=b"a=1&b=2")
+        assert key != await get_cache_key(query=b"a=1&b=2", body=b"{}")
+        assert await get_cache_key(query=b"a%3Db=") != await get_cache_key(
+            query=b"a=b%3D"
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_cache_key_headers(self, mock_config):
+        """Test that only headers that can change the reply affect the key."""
+        middleware = MockResponseMiddleWare(config=mock_config)
+
+        async def get_cache_key(headers):
+            return await middleware.get_cache_key(make_request("/pet", headers=headers))
+
+        key = await get_cache_key({"accept": "application/json"})
+
+        assert key != await get_cache_key({"accept": "application/xml"})
+        assert key != await get_cache_key(
+            {"accept": "application/json", "cookie": "session=1"}
+        )
+        assert key != await get_cache_key(
+            {"accept": "application/json", "x-api-key": "secret"}
+        )
+        assert key == await get_cache_key(
+            {"accept": "application/json", "user-agent": "curl/8.0"}
+        )